@@ -0,0 +1,1286 @@
+"""Проверка оформления документа .docx на соответствие требованиям нормоконтроля.
+
+Основная точка входа — :func:`check_document_formatting`: копирует исходный
+документ, прогоняет по нему набор проверок (структурные элементы, заголовки,
+списки, таблицы, рисунки, общее оформление), подсвечивает ошибочные фрагменты
+красным фоном и сохраняет список ошибок в JSON.
+"""
+
+import json
+import os
+import re
+import shutil
+from collections import Counter, deque
+from copy import deepcopy
+from dataclasses import dataclass
+from functools import lru_cache
+from enum import Enum, IntFlag, auto
+from itertools import chain, groupby
+from typing import Dict, List, Optional
+
+from docx import Document
+from docx.enum.text import WD_ALIGN_PARAGRAPH, WD_LINE_SPACING
+from docx.oxml import OxmlElement, parse_xml
+from docx.oxml.ns import nsmap, qn
+from docx.text.paragraph import Paragraph
+
+from app.utils.logger import app_logger
+
+
+class DocumentElementType(Enum):
+    """Тип элемента документа, к которому относится ошибка."""
+
+    PARAGRAPH = "paragraph"
+    TABLE = "table"
+    IMAGE = "image"
+    DOCUMENT = "document"
+
+
+@dataclass(slots=True)
+class Error:
+    """Одна ошибка оформления.
+
+    Слоты вдвое дешевле словаря по памяти и аллокации; в словарь ошибка
+    превращается только на внешней границе — при сериализации в JSON.
+    """
+
+    message: str
+    element: object = None
+    index: int = -1
+    element_type: str = DocumentElementType.PARAGRAPH.value
+
+
+class ErrorList(deque):
+    """Очередь ошибок с потоковой дедупликацией при вставке.
+
+    Набор уже виденных ключей живёт прямо в коллекции, поэтому повтор
+    отбрасывается в момент добавления и финальный проход
+    :func:`remove_duplicate_errors` по объединённому списку не нужен.
+    """
+
+    __slots__ = ("seen",)
+
+    def __init__(self):
+        super().__init__()
+        self.seen = set()
+
+
+def add_error(errors, message, element=None, index=-1,
+              element_type=DocumentElementType.PARAGRAPH):
+    """Добавляет ошибку в общий список, пропуская точные повторы."""
+    element_type = element_type.value
+    seen = getattr(errors, "seen", None)
+    if seen is not None:
+        key = (message, index, element_type)
+        if key in seen:
+            return
+        seen.add(key)
+    errors.append(Error(message, element, index, element_type))
+
+
+def remove_duplicate_errors(errors):
+    """Убирает повторяющиеся ошибки (одинаковое сообщение, позиция и тип)."""
+    seen = set()
+    unique_errors = []
+    for error in errors:
+        # ключ — кортеж атрибутов в фиксированном порядке; сортировка пар,
+        # оставшаяся от словарного представления, здесь не нужна
+        key = (error.message, error.index, error.element_type)
+        if key not in seen:
+            seen.add(key)
+            unique_errors.append(error)
+    return unique_errors
+
+
+# Готовый элемент заливки: клонирование дешевле, чем сборка OxmlElement
+# и два set() на каждый помечаемый run
+_SHD_RED_TEMPLATE = parse_xml(
+    f'<w:shd xmlns:w="{nsmap["w"]}" w:val="clear" w:fill="FF0000"/>')
+
+
+def set_red_background(run):
+    """Подсвечивает run красным фоном (заливка w:shd)."""
+    rPr = run._element.get_or_add_rPr()
+    shd = rPr.find(qn("w:shd"))
+    if shd is not None:
+        rPr.remove(shd)
+    rPr.append(deepcopy(_SHD_RED_TEMPLATE))
+
+
+def _bulk_set_red_background(runs):
+    """Помечает собранные runs красным фоном за один проход.
+
+    Каждый run заливается не более одного раза, сколько бы проверок его ни
+    забраковало; qn-теги вычислены до цикла.
+    """
+    shd_tag = qn("w:shd")
+    for run in runs:
+        rPr = run._element.get_or_add_rPr()
+        shd = rPr.find(shd_tag)
+        if shd is not None:
+            rPr.remove(shd)
+        rPr.append(deepcopy(_SHD_RED_TEMPLATE))
+
+
+def _mark_paragraph_red(paragraph):
+    """Помечает все непустые runs абзаца за один проход по XML.
+
+    Обходит ``w:r`` напрямую через lxml, не создавая обёртки Run и не
+    возвращаясь к дереву по одному разу на каждый run.
+    """
+    for r in paragraph._p.findall(qn("w:r")):
+        if not any((t.text or "").strip() for t in r.findall(qn("w:t"))):
+            continue
+        rPr = r.find(qn("w:rPr"))
+        if rPr is None:
+            rPr = OxmlElement("w:rPr")
+            r.insert(0, rPr)
+        shd = rPr.find(qn("w:shd"))
+        if shd is not None:
+            rPr.remove(shd)
+        rPr.append(deepcopy(_SHD_RED_TEMPLATE))
+
+
+def get_file_paths(file_path):
+    """Возвращает пути для проверенной копии документа и JSON-файла ошибок."""
+    directory, file_name = os.path.split(file_path)
+    stem, suffix = os.path.splitext(file_name)
+    new_file_path = os.path.join(directory, f"{stem}_NEW{suffix}")
+    json_file_path = os.path.join(directory, f"{stem}_errors.json")
+    return new_file_path, json_file_path
+
+
+def check_double_spaces(text, paragraph, index, errors):
+    """Проверяет абзац на двойные пробелы."""
+    if "  " in text:
+        add_error(errors, "В тексте обнаружены двойные пробелы.",
+                  element=paragraph, index=index,
+                  element_type=DocumentElementType.PARAGRAPH)
+
+
+def _rpr_key(run):
+    """Ключ прямого форматирования run: (шрифт, размер в пт, bold, italic).
+
+    Читает ``w:rPr`` напрямую из XML, не создавая объект ``Font`` на каждый
+    run; как и ``Font``, учитывает только прямое форматирование.
+    """
+    rPr = run._r.find(qn("w:rPr"))
+    if rPr is None:
+        return (None, None, False, False)
+    rFonts = rPr.find(qn("w:rFonts"))
+    name = rFonts.get(qn("w:ascii")) if rFonts is not None else None
+    sz = rPr.find(qn("w:sz"))
+    sz_val = sz.get(qn("w:val")) if sz is not None else None
+    size_pt = int(sz_val) / 2 if sz_val and sz_val.isdigit() else None
+    b = rPr.find(qn("w:b"))
+    bold = b is not None and b.get(qn("w:val")) not in ("0", "false")
+    it = rPr.find(qn("w:i"))
+    italic = it is not None and it.get(qn("w:val")) not in ("0", "false")
+    return (name, size_pt, bold, italic)
+
+
+def _snapshot_runs(paragraph):
+    """Снимает свойства всех runs абзаца за один проход по XML.
+
+    Возвращает список кортежей
+    ``(run, text, непустой, имя шрифта, кегль в pt, жирный, курсив, подчёркнутый)``,
+    чтобы проверки не обращались к ``run.font.*`` повторно.
+    """
+    return [
+        (run,
+         run.text,
+         bool((run.text or "").strip()),
+         run.font.name,
+         run.font.size.pt if run.font.size is not None else None,
+         run.font.bold,
+         run.font.italic,
+         run.font.underline)
+        for run in paragraph.runs
+    ]
+
+
+# Значения выравнивания, связанные один раз на уровне модуля: в горячих
+# сравнениях это избавляет от поиска атрибута перечисления на каждый абзац
+_ALIGN_LEFT = WD_ALIGN_PARAGRAPH.LEFT
+_ALIGN_CENTER = WD_ALIGN_PARAGRAPH.CENTER
+_ALIGN_JUSTIFY = WD_ALIGN_PARAGRAPH.JUSTIFY
+
+# Допустимые значения выравнивания подписей: frozenset на уровне модуля
+# вместо списка-литерала, пересоздаваемого на каждой итерации
+_ALLOWED_CAPTION_ALIGN = frozenset({_ALIGN_LEFT, None})
+_ALLOWED_FIG_ALIGN = frozenset({_ALIGN_CENTER, None})
+
+# Знаки препинания, запрещённые в конце подписи рисунка: проверка последнего
+# символа через frozenset вместо endswith с кортежем-литералом
+_END_PUNCT = frozenset(".,!?/-;:")
+
+# Буквы, допустимые в обозначениях приложений (ГОСТ 7.32)
+# Скомпилированные шаблоны подписей и номеров: re.match со строковым
+# литералом на каждый абзац тянет поиск в кэше модуля re, компиляция один
+# раз на модуль убирает эти накладные расходы из горячего цикла
+# Классификация абзаца по первому слову: один partition вместо серии
+# text.startswith по каждому известному префиксу
+_KIND_APPENDIX, _KIND_TABLE, _KIND_CONTINUATION, _KIND_ENDING = range(4)
+_TABLE_PREFIX_KINDS = {
+    "Приложение": _KIND_APPENDIX,
+    "Таблица": _KIND_TABLE,
+    "Продолжение": _KIND_CONTINUATION,
+    "Окончание": _KIND_ENDING,
+}
+
+_HEADING_NUM_RE = re.compile(r"^(\d+)\s+(.+)")
+_TABLE_CAPTION_RE = re.compile(r"^Таблица\s+(\S+)\s*–\s*(.+)$")
+_APPENDIX_NUM_RE = re.compile(r"([А-Я])\.(\d+)")
+def _collect_structure(paragraphs):
+    """Однопроходный сбор структуры документа для проверок подписей.
+
+    Возвращает словарь «номер раздела-заголовка → индекс абзаца». Проверки
+    дальше только читают готовую карту — обход дерева отделён от валидации,
+    и подпись вида «Таблица 3.1» корректно находит раздел 3, даже если
+    заголовок стоит в документе после неё.
+    """
+    heading_numbers: Dict[str, int] = {}
+    for i, paragraph in enumerate(paragraphs):
+        text = paragraph.text.strip()
+        if not text:
+            continue
+        heading_match = _HEADING_NUM_RE.match(text)
+        if heading_match and (paragraph.style.name or "").startswith("Heading"):
+            heading_numbers[heading_match.group(1)] = i
+    return heading_numbers
+
+
+@lru_cache(maxsize=512)
+def _parse_ref(ref_number):
+    """Разбирает номер приложения вида «А.1» в кортеж (буква, номер).
+
+    Возвращает ``(None, None)``, если строка не похожа на такой номер.
+    Номер продолжения обычно встречается дважды — в «Продолжении» и в
+    «Окончании»; кэш избавляет от повторного прогона шаблона.
+    """
+    m = _APPENDIX_NUM_RE.match(ref_number)
+    return (m.group(1), int(m.group(2))) if m else (None, None)
+
+
+_W_P_TAG = qn("w:p")  # тег абзаца для обхода соседей без создания обёрток
+
+# Пространство имён DrawingML для поиска картинок внутри абзаца: поиск по
+# дереву не сериализует XML абзаца в строку, как это делает ``.xml``
+_PIC_NS = {"pic": "http://schemas.openxmlformats.org/drawingml/2006/picture"}
+
+
+def _has_picture(p_element):
+    """Определяет, содержит ли элемент абзаца картинку ``pic:pic``."""
+    return p_element.find(".//pic:pic", _PIC_NS) is not None
+
+# Идентификаторы шрифтовых проверок подписи для набора reported: одна и та же
+# ошибка абзаца не форматируется и не записывается повторно для каждой группы
+_CHK_FONT, _CHK_SIZE, _CHK_BOLD, _CHK_ITALIC = range(4)
+
+# Обе формы подписи рисунка одним шаблоном: какая ветвь сработала, видно по
+# заполненной именованной группе — один fullmatch вместо двух
+_FIG_CAPTION_RE = re.compile(
+    r"Рисунок (?:(?P<appendix>[А-Я]\.\d+)|(?P<main>\d+(?:\.\d+)?))"
+    r" – (?P<name>[А-Я].*)")
+# Единый шаблон номера подписи: ветви «буква приложения» и «сквозной или
+# Y.X» взаимоисключающие, одного fullmatch хватает вместо двух match и split
+_CAPTION_NUM_RE = re.compile(r"(?:([А-Я])\.(\d+)|(\d+)(?:\.(\d+))?)")
+
+_APPENDIX_LETTERS = frozenset("АБВГДЕЖИКЛМНПРСТУФХЦШЩЭЮЯ")
+
+# Допуски числовых проверок и биты маски _numeric_violations.
+# Length в python-docx — целое число EMU; сравнение сырых EMU с
+# предвычисленными порогами избавляет от деления в свойствах .pt/.inches.
+_TOL = 0.01
+_EMU_PT_TOL = int(0.01 * 12700)          # 0,01 пт в EMU
+_EMU_INCH_TOL = int(0.01 * 914400)       # 0,01 дюйма в EMU
+_EMU_FIRST_LINE_INDENT = int(0.49 * 914400)  # 1,25 см в EMU
+
+_V_FIRST_LINE = 1        # есть отступ первой строки (там, где он запрещён)
+_V_LEFT = 2              # отступ слева
+_V_RIGHT = 4             # отступ справа
+_V_SPACING = 8           # интервалы до/после абзаца
+_V_LINE_SPACING = 16     # межстрочный интервал не полуторный
+_V_NO_FIRST_LINE = 32    # отступ первой строки не равен 1,25 см
+
+
+_EMU_12PT = 12 * 12700  # знаменатель множителя межстрочного интервала
+
+
+def _numeric_violations(pPr):
+    """Оценивает все числовые правила формата абзаца за один проход.
+
+    Принимает элемент ``w:pPr`` (или ``None``) и возвращает битовую маску из
+    констант ``_V_*``; вызывающий код сам решает, какие биты для данного вида
+    абзаца являются ошибками. Чтение типизированных свойств CT_PPr напрямую
+    повторяет семантику ``ParagraphFormat``, но не создаёт обёртку на каждый
+    абзац и не спускается в ``w:pPr`` заново при каждой проверке.
+    """
+    if pPr is None:
+        return _V_NO_FIRST_LINE
+    mask = 0
+    fli = pPr.first_line_indent
+    if fli is not None:
+        emu = int(fli)
+        if abs(emu) > _EMU_PT_TOL:
+            mask |= _V_FIRST_LINE
+        if abs(emu - _EMU_FIRST_LINE_INDENT) > _EMU_INCH_TOL:
+            mask |= _V_NO_FIRST_LINE
+    else:
+        mask |= _V_NO_FIRST_LINE
+    left = pPr.ind_left
+    if left and abs(int(left)) > _EMU_INCH_TOL:
+        mask |= _V_LEFT
+    right = pPr.ind_right
+    if right and abs(int(right)) > _EMU_INCH_TOL:
+        mask |= _V_RIGHT
+    space_before = pPr.spacing_before
+    space_after = pPr.spacing_after
+    sb_bad = space_before is not None and abs(int(space_before)) > _EMU_PT_TOL
+    sa_bad = space_after is not None and abs(int(space_after)) > _EMU_PT_TOL
+    if sb_bad | sa_bad:
+        mask |= _V_SPACING
+    line = pPr.spacing_line
+    if line is not None:
+        if pPr.spacing_lineRule == WD_LINE_SPACING.MULTIPLE:
+            line_spacing = int(line) / _EMU_12PT
+        else:
+            line_spacing = int(line)
+        if abs(line_spacing - 1.5) > _TOL:
+            mask |= _V_LINE_SPACING
+    return mask
+
+
+def _indent_msgs(prefix):
+    """Готовые сообщения об отступах, индексируемые двухбитной маской."""
+    return ("",
+            f"{prefix} отступ слева не допускается.",
+            f"{prefix} отступ справа не допускается.",
+            f"{prefix} отступ слева и справа не допускается.")
+
+
+_BODY_INDENT_MSGS = _indent_msgs("В основном тексте")
+_IMAGE_INDENT_MSGS = _indent_msgs("У абзаца с рисунком")
+
+
+@dataclass(frozen=True)
+class BlockRules:
+    """Правила оформления для особых видов абзацев (приложение, листинг, код)."""
+
+    prefix: str
+    alignment: int
+    align_msg: str
+    font_name: str
+    font_msg: str
+    size_msg: Optional[str]
+    style_msg: str
+    check_underline: bool = False
+
+    def __post_init__(self):
+        # сообщения собираются один раз при создании правил, а не f-строкой
+        # на каждую ошибку
+        object.__setattr__(self, "first_line_msg",
+                           f"{self.prefix} отступ первой строки не допускается.")
+        object.__setattr__(self, "indent_msgs", _indent_msgs(self.prefix))
+        object.__setattr__(self, "spacing_msg",
+                           f"{self.prefix} интервалы до и после абзаца не допускаются.")
+
+
+_APPENDIX_RULES = BlockRules(
+    prefix="В приложении",
+    alignment=_ALIGN_CENTER,
+    align_msg="Заголовок приложения должен быть выровнен по центру.",
+    font_name="Times New Roman",
+    font_msg="В приложении шрифт должен быть Times New Roman.",
+    size_msg="В приложении размер шрифта должен быть 14 пт.",
+    style_msg="В приложении жирный шрифт и курсив не допускаются.")
+
+_LISTING_RULES = BlockRules(
+    prefix="У подписи листинга",
+    alignment=_ALIGN_JUSTIFY,
+    align_msg="Подпись листинга должна быть выровнена по ширине.",
+    font_name="Times New Roman",
+    font_msg="Шрифт подписи листинга должен быть Times New Roman.",
+    size_msg="Размер шрифта подписи листинга должен быть 14 пт.",
+    style_msg="Подпись листинга не должна быть жирной или курсивной.")
+
+_CODE_RULES = BlockRules(
+    prefix="В коде",
+    alignment=_ALIGN_LEFT,
+    align_msg="Код должен быть выровнен по левому краю.",
+    font_name="Courier New",
+    font_msg="В коде шрифт должен быть Courier New.",
+    size_msg=None,
+    style_msg="В коде жирный шрифт, курсив и подчёркивание не допускаются.",
+    check_underline=True)
+
+
+def _check_block_paragraph(paragraph, rules, errors, i, pPr):
+    """Выполняет общий набор проверок абзаца по правилам ``rules``."""
+    # горячий путь: пишем словари напрямую, минуя kwargs-вызов add_error
+    _append = errors.append
+    _PT = DocumentElementType.PARAGRAPH.value
+    mask = _numeric_violations(pPr)
+    if mask & _V_FIRST_LINE:
+        _append(Error(rules.first_line_msg, paragraph, i, _PT))
+    indent_mask = (mask >> 1) & 3  # биты _V_LEFT/_V_RIGHT
+    if indent_mask:
+        _append(Error(rules.indent_msgs[indent_mask], paragraph, i, _PT))
+    if mask & _V_SPACING:
+        _append(Error(rules.spacing_msg, paragraph, i, _PT))
+    alignment = pPr.jc_val if pPr is not None else None
+    if alignment is not None and alignment != rules.alignment:
+        _append(Error(rules.align_msg, paragraph, i, _PT))
+    # вердикты агрегируются по абзацу: каждое сообщение пишется один раз,
+    # сколько бы runs его ни подтвердило
+    name_err = size_err = style_err = False
+    for run, run_text, nonempty, font_name, font_size, bold, italic, underline in _snapshot_runs(paragraph):
+        if not nonempty:
+            continue
+        name_bad = bool(font_name) and font_name != rules.font_name
+        size_bad = rules.size_msg is not None and \
+            font_size is not None and font_size != 14
+        style_bad = bool(bold or italic
+                         or (rules.check_underline and underline))
+        if not (name_bad | size_bad | style_bad):
+            continue
+        name_err |= name_bad
+        size_err |= size_bad
+        style_err |= style_bad
+        set_red_background(run)
+    if name_err:
+        _append(Error(rules.font_msg, paragraph, i, _PT))
+    if size_err:
+        _append(Error(rules.size_msg, paragraph, i, _PT))
+    if style_err:
+        _append(Error(rules.style_msg, paragraph, i, _PT))
+
+
+class RequiredElement(IntFlag):
+    """Биты обязательных структурных элементов документа."""
+
+    CONTENTS = auto()
+    INTRODUCTION = auto()
+    CONCLUSION = auto()
+    REFERENCES = auto()
+
+
+_REQUIRED_TITLES = {
+    "СОДЕРЖАНИЕ": RequiredElement.CONTENTS,
+    "ВВЕДЕНИЕ": RequiredElement.INTRODUCTION,
+    "ЗАКЛЮЧЕНИЕ": RequiredElement.CONCLUSION,
+    "СПИСОК ИСПОЛЬЗОВАННЫХ ИСТОЧНИКОВ": RequiredElement.REFERENCES,
+}
+
+_REQUIRED_TITLE_BY_FLAG = {flag: title for title, flag in _REQUIRED_TITLES.items()}
+
+
+@dataclass(slots=True)
+class DocumentIndex:
+    """Однократный снимок абзацев документа, общий для всех проверок.
+
+    ``doc.paragraphs`` при каждом обращении заново строит список обёрток,
+    а ``paragraph.text`` обходит все runs абзаца — раньше каждая из шести
+    проверок делала это независимо. Снимок строится один раз в
+    :func:`check_document_formatting` и передаётся во все ``check_*``.
+    """
+
+    paragraphs: List[Paragraph]
+    # paragraph.text.strip() для каждого абзаца, в порядке документа
+    texts: List[str]
+
+
+def _build_document_index(doc):
+    """Строит :class:`DocumentIndex` одним проходом по телу документа."""
+    paragraphs = doc.paragraphs
+    return DocumentIndex(paragraphs, [p.text.strip() for p in paragraphs])
+
+
+def check_structural_elements(index):
+    """Проверяет обязательные структурные элементы документа.
+
+    Возвращает кортеж ``(errors, structural_paragraphs)``.
+    """
+    errors = ErrorList()
+    structural_paragraphs = []
+    present_mask = RequiredElement(0)
+
+    for i, (paragraph, text) in enumerate(zip(index.paragraphs, index.texts)):
+        if not text:
+            continue
+        upper = text.upper()
+        flag = _REQUIRED_TITLES.get(upper)
+        if flag is None:
+            continue
+        present_mask |= flag
+        structural_paragraphs.append(paragraph)
+
+        if text != upper:
+            add_error(errors,
+                      f"Структурный элемент «{text}» должен быть записан прописными буквами.",
+                      element=paragraph, index=i,
+                      element_type=DocumentElementType.PARAGRAPH)
+            _mark_paragraph_red(paragraph)
+        if paragraph.alignment is not None and paragraph.alignment != _ALIGN_CENTER:
+            add_error(errors,
+                      f"Структурный элемент «{upper}» должен быть выровнен по центру.",
+                      element=paragraph, index=i,
+                      element_type=DocumentElementType.PARAGRAPH)
+            _mark_paragraph_red(paragraph)
+
+    for flag in RequiredElement:
+        if not present_mask & flag:
+            add_error(errors,
+                      f"В документе отсутствует обязательный структурный элемент «{_REQUIRED_TITLE_BY_FLAG[flag]}».",
+                      element=None, index=-1,
+                      element_type=DocumentElementType.DOCUMENT)
+    return list(errors), structural_paragraphs
+
+
+def check_heading_formatting(index):
+    """Проверяет оформление заголовков разделов и подразделов.
+
+    Возвращает кортеж ``(errors, heading_paragraphs)``.
+    """
+    errors = ErrorList()
+    heading_paragraphs = []
+
+    for i, (paragraph, text) in enumerate(zip(index.paragraphs, index.texts)):
+        if not text:
+            continue
+        style_name = paragraph.style.name or ""
+        if not style_name.startswith("Heading"):
+            continue
+        heading_paragraphs.append(paragraph)
+
+        if text.endswith("."):
+            add_error(errors, "В конце заголовка точка не ставится.",
+                      element=paragraph, index=i,
+                      element_type=DocumentElementType.PARAGRAPH)
+            _mark_paragraph_red(paragraph)
+        if not re.match(r"^\d+(?:\.\d+)*\s+\S", text) and text != text.upper():
+            add_error(errors,
+                      "Заголовок раздела должен начинаться с номера раздела.",
+                      element=paragraph, index=i,
+                      element_type=DocumentElementType.PARAGRAPH)
+        for run in paragraph.runs:
+            if not run.text.strip():
+                continue
+            if run.font.name and run.font.name != "Times New Roman":
+                add_error(errors,
+                          "Шрифт заголовка должен быть Times New Roman.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+                set_red_background(run)
+            if run.font.bold is False:
+                add_error(errors, "Заголовок должен быть выделен жирным.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+                set_red_background(run)
+    return list(errors), heading_paragraphs
+
+
+def check_list_formatting(index):
+    """Проверяет оформление перечислений (маркированных списков).
+
+    Возвращает кортеж ``(errors, list_paragraphs)``.
+    """
+    errors = ErrorList()
+    list_paragraphs = []
+
+    for i, (paragraph, text) in enumerate(zip(index.paragraphs, index.texts)):
+        if not text:
+            continue
+        style_name = paragraph.style.name or ""
+        is_list_style = "List" in style_name
+        starts_with_marker = text.startswith(("-", "–", "•", "*"))
+        if not is_list_style and not starts_with_marker:
+            continue
+        list_paragraphs.append(paragraph)
+
+        if starts_with_marker and not text.startswith("–"):
+            add_error(errors,
+                      "Элемент перечисления должен начинаться с тире «–».",
+                      element=paragraph, index=i,
+                      element_type=DocumentElementType.PARAGRAPH)
+            _mark_paragraph_red(paragraph)
+        if text[-1] not in (";", ".", ":"):
+            add_error(errors,
+                      "Элемент перечисления должен заканчиваться «;» или «.».",
+                      element=paragraph, index=i,
+                      element_type=DocumentElementType.PARAGRAPH)
+    return list(errors), list_paragraphs
+
+
+@dataclass(frozen=True)
+class CaptionNumberMessages:
+    """Тексты ошибок нумерации подписей для данного вида объекта.
+
+    Сама проверка номера одна на всех — :func:`_check_caption_number`;
+    вид объекта («таблица», «рисунок») задаётся только этой таблицей
+    сообщений, по образцу :class:`BlockRules`.
+    """
+
+    wrong_appendix: str
+    appendix_order: str
+    through_order: str
+    missing_section: str
+    section_order: str
+    zero_start: Optional[str] = None
+
+
+_TABLE_NUM_MSGS = CaptionNumberMessages(
+    wrong_appendix="Номер таблицы «{number}» не соответствует букве текущего приложения.",
+    appendix_order="Нарушена последовательность нумерации таблиц в приложении {letter}.",
+    through_order="Нарушена сквозная нумерация таблиц: ожидался номер {expected}.",
+    missing_section="Номер таблицы «{number}» ссылается на несуществующий раздел {section}.",
+    section_order="Нарушена нумерация таблиц в разделе {section}: ожидался номер {section}.{expected}.",
+)
+
+_FIG_NUM_MSGS = CaptionNumberMessages(
+    wrong_appendix="Номер рисунка «{number}» не соответствует букве текущего приложения.",
+    appendix_order="Нарушена последовательность нумерации рисунков в приложении {letter}.",
+    through_order="Нарушена сквозная нумерация рисунков: ожидался номер {expected}.",
+    missing_section="Номер рисунка «{number}» ссылается на несуществующий раздел {section}.",
+    section_order="Нарушена нумерация рисунков в разделе {section}: ожидался номер {section}.{expected}.",
+    zero_start="Номер рисунка «{number}» недопустим: нумерация в разделе начинается с 1.",
+)
+
+
+def _check_caption_number(number, msgs, errors, paragraph, i, current_appendix,
+                          heading_numbers, sequential_numbers, section_numbers):
+    """Проверяет номер подписи по таблице сообщений ``msgs``.
+
+    Возвращает формат номера («sequential» или «yx») для последующей
+    проверки единообразия либо ``None``, если номер относится к приложению
+    или вовсе не разобран. Шаблоны сообщений форматируются только на
+    редком пути — когда нарушение действительно найдено.
+    """
+    num_match = _CAPTION_NUM_RE.fullmatch(number)
+    if num_match is None:
+        return None
+    letter = num_match.group(1)
+    if letter:
+        if current_appendix is None or letter != current_appendix:
+            add_error(errors, msgs.wrong_appendix.format(number=number),
+                      element=paragraph, index=i,
+                      element_type=DocumentElementType.PARAGRAPH)
+        sequential_numbers[letter] += 1
+        if int(num_match.group(2)) != sequential_numbers[letter]:
+            add_error(errors, msgs.appendix_order.format(letter=letter),
+                      element=paragraph, index=i,
+                      element_type=DocumentElementType.PARAGRAPH)
+        return None
+    sub_number = num_match.group(4)
+    if sub_number is None:
+        sequential_numbers["main"] += 1
+        if int(num_match.group(3)) != sequential_numbers["main"]:
+            add_error(errors,
+                      msgs.through_order.format(
+                          expected=sequential_numbers["main"]),
+                      element=paragraph, index=i,
+                      element_type=DocumentElementType.PARAGRAPH)
+        return "sequential"
+    sub = int(sub_number)
+    if sub == 0 and msgs.zero_start:
+        add_error(errors, msgs.zero_start.format(number=number),
+                  element=paragraph, index=i,
+                  element_type=DocumentElementType.PARAGRAPH)
+    section = str(int(num_match.group(3)))
+    if section not in heading_numbers:
+        add_error(errors,
+                  msgs.missing_section.format(number=number, section=section),
+                  element=paragraph, index=i,
+                  element_type=DocumentElementType.PARAGRAPH)
+    section_numbers[section] += 1
+    if sub != section_numbers[section]:
+        add_error(errors,
+                  msgs.section_order.format(
+                      section=section, expected=section_numbers[section]),
+                  element=paragraph, index=i,
+                  element_type=DocumentElementType.PARAGRAPH)
+    return "yx"
+
+
+@dataclass(slots=True)
+class TableState:
+    """Состояние продолжений таблицы с данным номером подписи."""
+
+    has_continuation: bool = False
+    last_paragraph: Optional[Paragraph] = None
+    last_index: int = -1
+
+
+def check_table_formatting(doc, index):
+    """Проверяет подписи и оформление таблиц.
+
+    Возвращает кортеж ``(errors, caption_paragraphs)``.
+    """
+    # deque растёт без переаллокаций списка на каждый порог ёмкости
+    errors = ErrorList()
+    caption_paragraphs = []
+    # runs с ошибками копим в set и заливаем одним проходом в конце: подпись,
+    # заваленная несколькими проверками, мутирует XML один раз, а не 4-5
+    err_runs = set()
+    # пары (индекс абзаца, проверка), по которым ошибка уже записана
+    reported = set()
+    table_captions: Dict[str, int] = {}
+    sequential_numbers = Counter()
+    section_numbers = Counter()
+    table_states: Dict[str, TableState] = {}
+    # (индекс, абзац, формат номера) — единообразие проверяется пост-проходом
+    caption_formats = []
+    current_appendix = None
+
+    paragraphs = index.paragraphs
+    texts = index.texts
+    # карта элемент -> (индекс, абзац): поиск абзаца по lxml-элементу за O(1)
+    # вместо линейного прохода по списку на каждое обращение
+    para_by_elem = {p._element: (i, p) for i, p in enumerate(paragraphs)}
+    heading_numbers = _collect_structure(paragraphs)
+
+    for i, paragraph in enumerate(paragraphs):
+        text = texts[i]
+        if not text:
+            continue
+
+        kind = _TABLE_PREFIX_KINDS.get(text.partition(" ")[0])
+        if kind is None:
+            continue
+
+        if kind == _KIND_APPENDIX:
+            parts = text.split()
+            appendix_letter = parts[1] if len(parts) > 1 else ""
+            if len(appendix_letter) == 1 and appendix_letter in _APPENDIX_LETTERS:
+                current_appendix = appendix_letter
+            continue
+
+        if kind == _KIND_TABLE:
+            # runs — lxml-дескриптор, пересобирающий список при каждом
+            # обращении; берём его один раз на подпись, а «видимые» runs
+            # вычисляем единожды: каждое чтение .text обходит w:t-детей
+            runs = paragraph.runs
+            text_runs = [run for run in runs if run.text.strip()]
+            caption_match = _TABLE_CAPTION_RE.match(text)
+            if not caption_match:
+                add_error(errors,
+                          "Подпись таблицы должна иметь вид «Таблица <номер> – <название>».",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+                err_runs.update(text_runs)
+                continue
+
+            table_number = caption_match.group(1)
+            table_name = caption_match.group(2)
+            caption_paragraphs.append(paragraph)
+            table_captions[table_number] = i
+
+            current_format = _check_caption_number(
+                table_number, _TABLE_NUM_MSGS, errors, paragraph, i,
+                current_appendix, heading_numbers,
+                sequential_numbers, section_numbers)
+            if current_format:
+                caption_formats.append((i, paragraph, current_format))
+
+            if table_name.endswith("."):
+                add_error(errors, "В конце названия таблицы точка не ставится.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+                err_runs.update(text_runs)
+            if paragraph.alignment not in _ALLOWED_CAPTION_ALIGN:
+                add_error(errors,
+                          "Подпись таблицы должна быть выровнена по левому краю.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+                err_runs.update(text_runs)
+            # соседние runs часто делят одинаковый rPr — проверяем ключ
+            # форматирования один раз на группу, а не на каждый run
+            if not text_runs:
+                continue
+            text_run_set = set(text_runs)
+            for key, group_runs in groupby(runs, key=_rpr_key):
+                group = [run for run in group_runs if run in text_run_set]
+                if not group:
+                    continue
+                font_name, size_pt, bold, italic = key
+                font_bad = bool(font_name) and font_name != "Times New Roman"
+                size_bad = size_pt is not None and size_pt != 14
+                if font_bad and (i, _CHK_FONT) not in reported:
+                    reported.add((i, _CHK_FONT))
+                    add_error(errors,
+                              "Шрифт подписи таблицы должен быть Times New Roman.",
+                              element=paragraph, index=i,
+                              element_type=DocumentElementType.PARAGRAPH)
+                if size_bad and (i, _CHK_SIZE) not in reported:
+                    reported.add((i, _CHK_SIZE))
+                    add_error(errors,
+                              "Размер шрифта подписи таблицы должен быть 14 пт.",
+                              element=paragraph, index=i,
+                              element_type=DocumentElementType.PARAGRAPH)
+                if bold and (i, _CHK_BOLD) not in reported:
+                    reported.add((i, _CHK_BOLD))
+                    add_error(errors,
+                              "Подпись таблицы не должна быть жирной.",
+                              element=paragraph, index=i,
+                              element_type=DocumentElementType.PARAGRAPH)
+                if italic and (i, _CHK_ITALIC) not in reported:
+                    reported.add((i, _CHK_ITALIC))
+                    add_error(errors,
+                              "Подпись таблицы не должна быть курсивной.",
+                              element=paragraph, index=i,
+                              element_type=DocumentElementType.PARAGRAPH)
+                if font_bad | size_bad | bold | italic:
+                    err_runs.update(group)
+            continue
+
+        if kind == _KIND_CONTINUATION and text.startswith("Продолжение таблицы"):
+            ref_number = text[len("Продолжение таблицы"):].strip()
+            if text != "Продолжение таблицы " + ref_number:
+                add_error(errors,
+                          "Подпись продолжения таблицы должна иметь вид «Продолжение таблицы <номер>».",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+            ref_letter = _parse_ref(ref_number)[0]
+            if ref_number not in table_captions:
+                add_error(errors,
+                          f"Продолжение таблицы «{ref_number}» не имеет исходной подписи.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+            if ref_letter and current_appendix is None:
+                add_error(errors,
+                          f"Продолжение таблицы «{ref_number}» с номером приложения вне приложения.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+            state = table_states.get(ref_number)
+            if state is None:
+                state = table_states[ref_number] = TableState()
+            state.has_continuation = True
+            state.last_paragraph = paragraph
+            state.last_index = i
+            continue
+
+        if kind == _KIND_ENDING and text.startswith("Окончание таблицы"):
+            ref_number = text[len("Окончание таблицы"):].strip()
+            ref_letter = _parse_ref(ref_number)[0]
+            if ref_number not in table_captions:
+                add_error(errors,
+                          f"Окончание таблицы «{ref_number}» не имеет исходной подписи.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+            state = table_states.get(ref_number)
+            if state is None or not state.has_continuation:
+                add_error(errors,
+                          f"Окончание таблицы «{ref_number}» без предшествующего продолжения.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+            if ref_letter and current_appendix is None:
+                add_error(errors,
+                          f"Окончание таблицы «{ref_number}» с номером приложения вне приложения.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+            if state is None:
+                state = table_states[ref_number] = TableState()
+            state.has_continuation = False
+            continue
+
+    # один линейный проход по собранным форматам вместо сравнения в каждой
+    # итерации горячего цикла
+    prev_format = None
+    for idx, caption, caption_format in caption_formats:
+        if prev_format and caption_format != prev_format:
+            add_error(errors,
+                      "Нумерация таблиц должна быть единообразной во всём документе.",
+                      element=caption, index=idx,
+                      element_type=DocumentElementType.PARAGRAPH)
+        prev_format = caption_format
+
+    for number, state in table_states.items():
+        if state.has_continuation:
+            add_error(errors,
+                      f"После «Продолжение таблицы {number}» должно следовать «Окончание таблицы {number}».",
+                      element=state.last_paragraph, index=state.last_index,
+                      element_type=DocumentElementType.PARAGRAPH)
+
+    for table_index, table in enumerate(doc.tables):
+        caption_text = None
+        # идём по соседям напрямую: не-абзацы отсекаются сравнением тега,
+        # текст абзаца берётся из снимка одним обращением к para_by_elem
+        prev_element = table._element.getprevious()
+        while prev_element is not None:
+            if prev_element.tag == _W_P_TAG:
+                entry = para_by_elem.get(prev_element)
+                if entry is not None and texts[entry[0]]:
+                    caption_text = texts[entry[0]]
+                    break
+            prev_element = prev_element.getprevious()
+        if caption_text is None or not caption_text.startswith(
+                ("Таблица ", "Продолжение таблицы ", "Окончание таблицы ")):
+            add_error(errors,
+                      "Непосредственно перед таблицей должна находиться её подпись.",
+                      element=table, index=table_index,
+                      element_type=DocumentElementType.TABLE)
+
+        # сосед справа известен дереву напрямую — незачем перебирать все
+        # абзацы в поисках того, чей getprevious() совпадёт с таблицей
+        next_entry = para_by_elem.get(table._element.getnext())
+        if next_entry is not None and texts[next_entry[0]]:
+            add_error(errors,
+                      "После таблицы должна следовать пустая строка.",
+                      element=table, index=table_index,
+                      element_type=DocumentElementType.TABLE)
+
+    _bulk_set_red_background(err_runs)
+
+    return list(errors), caption_paragraphs
+
+
+def check_image_formatting(index, skip_paragraphs=None):
+    """Проверяет рисунки и их подписи.
+
+    Возвращает кортеж ``(errors, caption_paragraphs)``.
+    """
+    if skip_paragraphs is None:
+        skip_paragraphs = []
+    # id() lxml-элементов вместо линейного сравнения обёрток: элементы живы,
+    # пока жив документ, поэтому идентификаторы стабильны
+    skip_ids = frozenset(id(p._element) for p in skip_paragraphs)
+    errors = ErrorList()
+    caption_paragraphs = []
+    sequential_numbers = Counter()
+    section_numbers = Counter()
+    last_caption_format = None
+    current_appendix = None
+    paragraphs = index.paragraphs
+    texts = index.texts
+    n = len(paragraphs)
+    heading_numbers = _collect_structure(paragraphs)
+
+    for i, paragraph in enumerate(paragraphs):
+        text = texts[i]
+        if not text:
+            if not _has_picture(paragraph._element):
+                continue
+
+        if text.startswith("Приложение"):
+            parts = text.split()
+            if len(parts) > 1 and len(parts[1]) == 1:
+                current_appendix = parts[1]
+            continue
+
+        # дешёвый префикс-фильтр: regex запускается только для абзацев,
+        # вообще способных быть подписью рисунка
+        caption_match = (_FIG_CAPTION_RE.fullmatch(text)
+                         if text.startswith("Рисунок ") else None)
+        if caption_match:
+            appendix_number = caption_match.group("appendix")
+            figure_number = appendix_number or caption_match.group("main")
+            figure_name = caption_match.group("name")
+            caption_paragraphs.append(paragraph)
+
+            # какие бы проверки ни сработали, абзац заливается одним проходом
+            needs_red = False
+            if text[-1] in _END_PUNCT:
+                add_error(errors,
+                          "В конце подписи рисунка знак препинания не ставится.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+                needs_red = True
+            if paragraph.alignment not in _ALLOWED_FIG_ALIGN:
+                add_error(errors,
+                          "Подпись рисунка должна быть выровнена по центру.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+                needs_red = True
+            if needs_red:
+                _mark_paragraph_red(paragraph)
+
+            current_format = _check_caption_number(
+                figure_number, _FIG_NUM_MSGS, errors, paragraph, i,
+                current_appendix, heading_numbers,
+                sequential_numbers, section_numbers)
+            if current_format:
+                if last_caption_format and current_format != last_caption_format:
+                    add_error(errors,
+                              "Нумерация рисунков должна быть единообразной во всём документе.",
+                              element=paragraph, index=i,
+                              element_type=DocumentElementType.PARAGRAPH)
+                last_caption_format = current_format
+
+            for run in paragraph.runs:
+                if not run.text.strip():
+                    continue
+                # сначала все четыре проверки, заливка — одним вызовом в
+                # конце; свойства font каждый раз парсят rPr — читаем однажды
+                font = run.font
+                font_name = font.name
+                font_size = font.size
+                run_bad = False
+                if font_name and font_name != "Times New Roman":
+                    add_error(errors,
+                              "Шрифт подписи рисунка должен быть Times New Roman.",
+                              element=paragraph, index=i,
+                              element_type=DocumentElementType.PARAGRAPH)
+                    run_bad = True
+                if font_size is not None and font_size.pt != 14:
+                    add_error(errors,
+                              "Размер шрифта подписи рисунка должен быть 14 пт.",
+                              element=paragraph, index=i,
+                              element_type=DocumentElementType.PARAGRAPH)
+                    run_bad = True
+                if font.bold:
+                    add_error(errors,
+                              "Подпись рисунка не должна быть жирной.",
+                              element=paragraph, index=i,
+                              element_type=DocumentElementType.PARAGRAPH)
+                    run_bad = True
+                if font.italic:
+                    add_error(errors,
+                              "Подпись рисунка не должна быть курсивной.",
+                              element=paragraph, index=i,
+                              element_type=DocumentElementType.PARAGRAPH)
+                    run_bad = True
+                if run_bad:
+                    set_red_background(run)
+        elif _has_picture(paragraph._element):
+            # pPr читаем один раз и идём типизированными аксессорами CT_PPr:
+            # каждое обращение к paragraph_format заново спускалось бы в XML
+            pPr = paragraph._element.pPr
+            if pPr is None:
+                alignment = first_line = left = right = None
+            else:
+                alignment = pPr.jc_val
+                first_line = pPr.first_line_indent
+                left = pPr.ind_left
+                right = pPr.ind_right
+            if alignment not in _ALLOWED_FIG_ALIGN:
+                add_error(errors,
+                          "Рисунок должен быть выровнен по центру.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.IMAGE)
+            if first_line and abs(int(first_line)) > _EMU_PT_TOL:
+                add_error(errors,
+                          "У абзаца с рисунком не должно быть отступа первой строки.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.IMAGE)
+            indent_mask = 0
+            if left and abs(int(left)) > _EMU_INCH_TOL:
+                indent_mask |= 1
+            if right and abs(int(right)) > _EMU_INCH_TOL:
+                indent_mask |= 2
+            if indent_mask:
+                add_error(errors, _IMAGE_INDENT_MSGS[indent_mask],
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.IMAGE)
+
+            if i + 1 < n:
+                next_paragraph = paragraphs[i + 1]
+                if id(next_paragraph._element) not in skip_ids:
+                    next_text = texts[i + 1]
+                    if not (next_text.startswith("Рисунок ")
+                            and _FIG_CAPTION_RE.fullmatch(next_text)):
+                        add_error(errors,
+                                  "Непосредственно после рисунка должна следовать его подпись.",
+                                  element=paragraph, index=i,
+                                  element_type=DocumentElementType.IMAGE)
+            else:
+                add_error(errors,
+                          "Непосредственно после рисунка должна следовать его подпись.",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.IMAGE)
+
+    return list(errors), caption_paragraphs
+
+
+def check_general_formatting(doc, index, table_and_image_captions,
+                             heading_and_list_and_structural_paragraphs):
+    """Проверяет общее оформление основного текста документа.
+
+    Абзацы подписей, заголовков, списков, структурных элементов и кода
+    проверяются по своим правилам и исключаются из общей проверки.
+    """
+    errors = ErrorList()
+    # горячий путь: пишем объекты Error напрямую, минуя вызов add_error;
+    # повторы здесь исключены агрегацией по абзацу, а не набором seen
+    _append = errors.append
+    _PT = DocumentElementType.PARAGRAPH.value
+
+    paragraphs = index.paragraphs
+    texts = index.texts
+    n = len(paragraphs)
+
+    # классифицируем абзацы с кодом один раз; is_code_flags индексируется
+    # номером абзаца и переиспользуется всеми ветками ниже
+    code_paragraphs = []
+    is_code_flags = bytearray(n)
+    # сырой обход w:r: классификация по шрифту затрагивает каждый абзац
+    # документа, а paragraph.runs строил бы обёртки Run/Font на каждый run
+    r_tag = qn("w:r")
+    t_tag = qn("w:t")
+    rpr_tag = qn("w:rPr")
+    rfonts_tag = qn("w:rFonts")
+    ascii_attr = qn("w:ascii")
+    for idx, paragraph in enumerate(paragraphs):
+        for r in paragraph._element.findall(r_tag):
+            rPr = r.find(rpr_tag)
+            if rPr is None:
+                continue
+            rFonts = rPr.find(rfonts_tag)
+            if rFonts is None or rFonts.get(ascii_attr) != "Courier New":
+                continue
+            if any((t.text or "").strip() for t in r.findall(t_tag)):
+                is_code_flags[idx] = 1
+                code_paragraphs.append(paragraph)
+                break
+
+    # один XPath-проход за всеми w:pPr тела документа: проверки дальше
+    # работают по готовой карте, не спускаясь в дерево на каждый абзац
+    ppr_by_p = {pPr.getparent(): pPr
+                for pPr in doc.element.xpath("./w:body/w:p/w:pPr")}
+
+    # frozenset целочисленных id() дешевле по памяти и хэшированию, чем set
+    # самих элементов; абзацы живы до конца функции, поэтому id стабильны
+    excluded_ids = frozenset(
+        id(p._element) for p in chain(table_and_image_captions,
+                                      heading_and_list_and_structural_paragraphs,
+                                      code_paragraphs))
+
+    # Обход намеренно последовательный: дерево lxml, на которое опираются
+    # Paragraph/Run, нельзя пиклить для пула процессов, а одновременный доступ
+    # к одному дереву из нескольких потоков в lxml небезопасен.
+    for i, paragraph in enumerate(paragraphs):
+        stripped = texts[i]
+        if not stripped:
+            continue
+
+        # --- Заголовки приложений ---
+        if re.match(r"^Приложение\s+[А-Я]$", stripped):
+            _check_block_paragraph(paragraph, _APPENDIX_RULES, errors, i,
+                                   ppr_by_p.get(paragraph._element))
+            continue
+
+        # --- Подписи листингов ---
+        if stripped.startswith("Листинг "):
+            _check_block_paragraph(paragraph, _LISTING_RULES, errors, i,
+                                   ppr_by_p.get(paragraph._element))
+            # после подписи листинга должен идти код
+            if i + 1 < n and not is_code_flags[i + 1]:
+                add_error(errors,
+                          "После подписи листинга должен следовать код (Courier New).",
+                          element=paragraph, index=i,
+                          element_type=DocumentElementType.PARAGRAPH)
+            continue
+
+        # --- Код (Courier New) ---
+        if is_code_flags[i]:
+            _check_block_paragraph(paragraph, _CODE_RULES, errors, i,
+                                   ppr_by_p.get(paragraph._element))
+            continue
+
+        if id(paragraph._element) in excluded_ids:
+            continue
+
+        # --- Основной текст ---
+        pPr = ppr_by_p.get(paragraph._element)
+        mask = _numeric_violations(pPr)
+        if mask & _V_NO_FIRST_LINE:
+            _append(Error("Абзацный отступ основного текста должен быть 1,25 см.", paragraph, i, _PT))
+        indent_mask = (mask >> 1) & 3  # биты _V_LEFT/_V_RIGHT
+        if indent_mask:
+            _append(Error(_BODY_INDENT_MSGS[indent_mask], paragraph, i, _PT))
+        if mask & _V_SPACING:
+            _append(Error("В основном тексте интервалы до и после абзаца не допускаются.", paragraph, i, _PT))
+        if mask & _V_LINE_SPACING:
+            _append(Error("Межстрочный интервал основного текста должен быть полуторным.", paragraph, i, _PT))
+        alignment = pPr.jc_val if pPr is not None else None
+        if alignment is not None and alignment != _ALIGN_JUSTIFY:
+            _append(Error("Основной текст должен быть выровнен по ширине.", paragraph, i, _PT))
+        name_err = size_err = style_err = False
+        for run, run_text, nonempty, font_name, font_size, bold, italic, underline in _snapshot_runs(paragraph):
+            if not nonempty:
+                continue
+            name_bad = bool(font_name) and font_name != "Times New Roman"
+            size_bad = font_size is not None and font_size != 14
+            style_bad = bool(bold or italic or underline)
+            if not (name_bad | size_bad | style_bad):
+                continue
+            name_err |= name_bad
+            size_err |= size_bad
+            style_err |= style_bad
+            set_red_background(run)
+        if name_err:
+            _append(Error("Шрифт основного текста должен быть Times New Roman.", paragraph, i, _PT))
+        if size_err:
+            _append(Error("Размер шрифта основного текста должен быть 14 пт.", paragraph, i, _PT))
+        if style_err:
+            _append(Error("В основном тексте жирный шрифт, курсив и подчёркивание не допускаются.", paragraph, i, _PT))
+        check_double_spaces(stripped, paragraph, i, errors)
+
+    return list(errors)
+
+
+def add_comments_to_document(doc, errors, output_path):
+    """Добавляет в конец документа раздел с замечаниями и сохраняет его."""
+    doc.add_page_break()
+    doc.add_paragraph("ЗАМЕЧАНИЯ НОРМОКОНТРОЛЯ")
+    for num, error in enumerate(errors, start=1):
+        doc.add_paragraph(f"{num}. {error.message}")
+    doc.save(output_path)
+    app_logger.info("Документ с замечаниями сохранен: %s", output_path)
+
+
+def check_document_formatting(file_path):
+    """Проверяет документ и сохраняет результаты.
+
+    Создаёт копию ``<имя>_NEW.docx`` с подсветкой ошибок и файл
+    ``<имя>_errors.json`` со списком ошибок. Возвращает список ошибок.
+    """
+    new_file_path, json_file_path = get_file_paths(file_path)
+    # именно копия, не жёсткая ссылка: doc.save открывает файл на запись
+    # с усечением и через общий inode затёр бы исходный документ; copyfile
+    # на Linux и так идёт быстрым путём ядра (sendfile), без цикла чтения
+    shutil.copyfile(file_path, new_file_path)
+    new_doc = Document(new_file_path)
+    # тело документа обходится один раз; проверки работают по общему снимку
+    index = _build_document_index(new_doc)
+
+    # Проверки выполняются последовательно намеренно: все они пишут
+    # подсветку ошибок в одно дерево lxml, а одновременная работа с одним
+    # деревом из нескольких потоков в lxml небезопасна — пул потоков здесь
+    # дал бы гонки на XML, а не ускорение.
+
+    structural_errors, structural_paragraphs = check_structural_elements(index)
+    heading_errors, heading_paragraphs = check_heading_formatting(index)
+    list_errors, list_paragraphs = check_list_formatting(index)
+    table_errors, table_captions = check_table_formatting(new_doc, index)
+    image_errors, image_captions = check_image_formatting(
+        index, skip_paragraphs=structural_paragraphs)
+    general_formatting_errors = check_general_formatting(
+        new_doc, index,
+        table_captions + image_captions,
+        heading_paragraphs + list_paragraphs + structural_paragraphs)
+
+    # каждый список дедуплицирован при вставке (ErrorList.seen), а тексты
+    # сообщений у проверок не пересекаются — финальный проход не нужен;
+    # chain сливает шесть списков без промежуточных аллокаций «+»
+    all_errors = list(chain.from_iterable((
+        structural_errors, heading_errors, list_errors,
+        table_errors, image_errors, general_formatting_errors)))
+
+    if not all_errors:
+        # копия без ошибок уже лежит на диске после copyfile — повторная
+        # сериализация всего zip-архива не нужна
+        app_logger.info("Документ «%s» не содержит ошибок оформления.", file_path)
+    else:
+        add_comments_to_document(new_doc, all_errors, new_file_path)
+        app_logger.info("Найдено ошибок оформления: %d.", len(all_errors))
+
+    serializable_errors = [
+        {"message": error.message, "index": error.index,
+         "element_type": error.element_type}
+        for error in all_errors
+    ]
+    with open(json_file_path, "w", encoding="utf-8") as json_file:
+        json.dump(serializable_errors, json_file, ensure_ascii=False, indent=4)
+    app_logger.info("Список ошибок сохранен в файл: %s", json_file_path)
+
+    return all_errors
@@ -0,0 +1,23 @@
+"""Настройка логирования приложения."""
+
+import logging
+import sys
+
+
+def get_logger(name="app"):
+    """Возвращает настроенный логгер приложения."""
+    logger = logging.getLogger(name)
+    if not logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        # defaults подставляет пустой props прямо при форматировании:
+        # не нужен ни hasattr-чек на каждую запись, ни свой форматтер
+        handler.setFormatter(logging.Formatter(
+            "%(asctime)s [%(levelname)s] %(name)s: %(message)s%(props)s",
+            defaults={"props": ""},
+        ))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+    return logger
+
+
+app_logger = get_logger()
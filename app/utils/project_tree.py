@@ -0,0 +1,22 @@
+"""Вывод дерева файлов проекта (для отладки и отчёта)."""
+
+import os
+
+DEFAULT_IGNORE = {".git", "__pycache__", ".idea", ".venv", "venv", ".pytest_cache"}
+
+
+def print_tree(path, ignore=None, prefix=""):
+    """Рекурсивно печатает дерево каталога ``path``."""
+    if ignore is None:
+        ignore = DEFAULT_IGNORE
+    # os.scandir отдаёт DirEntry с закешированным is_dir() — без
+    # дополнительного stat-вызова на каждый элемент
+    with os.scandir(path) as entries:
+        items = sorted((entry for entry in entries if entry.name not in ignore),
+                       key=lambda entry: entry.name)
+    for idx, item in enumerate(items):
+        last = idx == len(items) - 1
+        connector = "└── " if last else "├── "
+        print(prefix + connector + item.name)
+        if item.is_dir(follow_symlinks=False):
+            print_tree(item.path, ignore, prefix + ("    " if last else "│   "))
@@ -0,0 +1,19 @@
+"""Запуск проверки нормоконтроля из командной строки."""
+
+import argparse
+
+from app.utils.formatting import check_document_formatting
+from app.utils.logger import app_logger
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Проверка оформления документа .docx на соответствие нормоконтролю")
+    parser.add_argument("file", help="путь к проверяемому документу .docx")
+    args = parser.parse_args()
+    errors = check_document_formatting(args.file)
+    app_logger.info("Проверка завершена, найдено ошибок: %d", len(errors))
+
+
+if __name__ == "__main__":
+    main()